@@ -1,12 +1,20 @@
 import asyncio
+import contextlib
+import hmac
 import time
-from contextlib import asynccontextmanager
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Final
 
+import aiohttp
+import orjson
 import sentry_sdk
 from asgi_correlation_id import CorrelationIdMiddleware
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 
 from config import config
 from core import notifications
@@ -16,76 +24,228 @@ from core.tools import available_tools
 from logging_conf import logger
 
 
-def check_time(last_time):
-    performance = time.time() - last_time
-    if performance > 25:
-        logger.warning(f"Performance of the API: {performance}")
+# Requests slower than this (in milliseconds) are logged as warnings
+PERF_THRESHOLD_MS: Final[int] = 25_000
+
+
+def check_time(start_ns, _thr=PERF_THRESHOLD_MS, _now=time.monotonic_ns):
+    performance = (_now() - start_ns) // 1_000_000
+    if performance > _thr:
+        logger.warning(f"Performance of the API: {performance} ms")
     else:
-        logger.debug(f"Performance of the API: {performance}")
-
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    sentry_sdk.init(
-        dsn=config.SENTRY_DSN,
-        send_default_pii=True,
-        traces_sample_rate=1.0,
-        profiles_sample_rate=1.0,
-    )
-    # Start background cleanup task
-    global _cleanup_task
-    _cleanup_task = asyncio.create_task(_cleanup_inactive())
-
-    yield
-
-    # Stop background cleanup task
-    if _cleanup_task:
-        _cleanup_task.cancel()
-        try:
-            await asyncio.gather(_cleanup_task, return_exceptions=True)
-        except Exception:
-            pass
+        logger.debug(f"Performance of the API: {performance} ms")
+
+
+class Lifespan:
+    """Application lifespan: startup on enter, shutdown on exit."""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+
+    async def __aenter__(self):
+        sentry_sdk.init(
+            dsn=config.SENTRY_DSN,
+            send_default_pii=True,
+            traces_sample_rate=1.0,
+            profiles_sample_rate=1.0,
+        )
+        # Size the default executor used by asyncio.to_thread (tool file I/O)
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=config.THREAD_POOL_SIZE, thread_name_prefix="io"
+            )
+        )
 
+        # Start background cleanup task
+        global _cleanup_task
+        _cleanup_task = asyncio.create_task(_cleanup_inactive())
 
-app = FastAPI(lifespan=lifespan)
+        # Shared HTTP session for every call to the WhatsApp API
+        http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=30)
+        )
+        self.app.state.http = http
+
+        # Start outbound message workers
+        _send_workers[:] = [
+            asyncio.create_task(_send_worker(http)) for _ in range(SEND_WORKERS)
+        ]
+
+    async def __aexit__(self, *exc):
+        # Deliver replies already queued and pending read receipts, then stop
+        # outbound message workers
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(send_queue.join(), SEND_DRAIN_TIMEOUT_SECONDS)
+        if _read_receipts:
+            await asyncio.wait(_read_receipts, timeout=SEND_DRAIN_TIMEOUT_SECONDS)
+        for worker in _send_workers:
+            worker.cancel()
+        await asyncio.gather(*_send_workers, return_exceptions=True)
+        _send_workers.clear()
+
+        await self.app.state.http.close()
+
+        # Stop background cleanup task
+        if _cleanup_task:
+            _cleanup_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await _cleanup_task
+
+
+app = FastAPI(lifespan=Lifespan)
 app.add_middleware(CorrelationIdMiddleware)
 
 
 bot = Agent("Legal Agent")
-WORDS_LIMIT = config.WORDS_LIMIT or 1500
-users_in_process: dict[str, bool] = {}
-wait_msg_index: dict[str, int] = {}
+WORDS_LIMIT: Final[int] = int(config.WORDS_LIMIT or 1500)
 
 # Inactivity cleanup configuration and state
-INACTIVITY_TTL_SECONDS: int = getattr(
-    config, "INACTIVITY_TTL_SECONDS", 24 * 60 * 60
-)  # 24 horas
-CLEANUP_INTERVAL_SECONDS: int = getattr(
-    config, "CLEANUP_INTERVAL_SECONDS", 60 * 60
-)  # 1 hora
-last_activity: dict[str, float] = {}
+INACTIVITY_TTL_SECONDS: Final[int] = config.INACTIVITY_TTL_SECONDS
+CLEANUP_INTERVAL_SECONDS: Final[int] = config.CLEANUP_INTERVAL_SECONDS
+_VERIFY_TOKEN_B: Final[bytes] = config.WHATSAPP_VERIFY_TOKEN.encode()
 _cleanup_task: asyncio.Task | None = None
 
+# Mensajes alternativos mientras el usuario tiene una respuesta en curso
+WAIT_MESSAGES: tuple[str, ...] = (
+    "Porfa dame un segundo para terminar de elaborar la respuesta 🕒",
+    "Un momento, estoy procesando tu pedido — te respondo enseguida ⏳",
+    "Disculpa la demora, estoy trabajando para darte la mejor respuesta 🤏",
+    "Estoy revisando la información; te escribo en breve 📡",
+    "Gracias por la paciencia — preparando tu respuesta ahora mismo 🔄",
+)
+_N_WAIT = len(WAIT_MESSAGES)
+
+# Outbound WhatsApp messages are delivered by a fixed pool of workers. Each
+# item holds every chunk of one reply, so a reply arrives in order.
+SEND_WORKERS = 8
+SEND_DRAIN_TIMEOUT_SECONDS = 10
+send_queue: asyncio.Queue[tuple[tuple[str, ...], str]] = asyncio.Queue(maxsize=1024)
+_send_workers: list[asyncio.Task] = []
+# Mark-as-read calls in flight, awaited on shutdown before closing the session
+_read_receipts: set[asyncio.Task] = set()
+
+
+@dataclass(slots=True)
+class UserState:
+    busy: bool = False
+    last_activity: float = 0.0
+    wait_idx: int = 0
+
+
+class StripedUserState:
+    """Per-user ``UserState`` entries.
+
+    Entries are split into ``N`` stripes selected by ``hash(phone) & (N - 1)``.
+    Each stripe is kept ordered by ``last_activity`` (oldest first), so the
+    cleanup sweep only touches expired entries; busy ones it meets are moved
+    to the tail and are reordered by ``touch`` once freed.
+    """
+
+    N = 16
+
+    def __init__(self):
+        self._stripes: list[OrderedDict[str, UserState]] = [
+            OrderedDict() for _ in range(self.N)
+        ]
+
+    def _stripe(self, phone: str) -> OrderedDict[str, UserState]:
+        return self._stripes[hash(phone) & (self.N - 1)]
+
+    def get(self, phone: str) -> UserState:
+        """Return the state for ``phone``, creating it on first use."""
+        states = self._stripe(phone)
+        st = states.get(phone)
+        if st is None:
+            st = states[phone] = UserState(last_activity=time.monotonic())
+        return st
+
+    def touch(self, phone: str) -> None:
+        """Refresh the last activity of ``phone`` and move it to the tail."""
+        states = self._stripe(phone)
+        states[phone].last_activity = time.monotonic()
+        states.move_to_end(phone)
+
+    def pop_expired(self, stripe: int, now: float, ttl: float) -> list[str]:
+        """Remove and return idle users of a single stripe."""
+        states = self._stripes[stripe]
+        expired: list[str] = []
+        for _ in range(len(states)):
+            phone, st = next(iter(states.items()))
+            # Oldest entry still fresh: nothing behind it expired
+            if now - st.last_activity <= ttl:
+                break
+            # In use (possibly stuck): skip it, it is touched again when freed
+            if st.busy:
+                states.move_to_end(phone)
+                continue
+            del states[phone]
+            expired.append(phone)
+        return expired
+
+
+user_states = StripedUserState()
+
+
+class _BusyGuard:
+    """Mark a user as busy for the duration of a ``with`` block."""
+
+    __slots__ = ("phone",)
+
+    def __init__(self, phone: str):
+        self.phone = phone
+
+    def __enter__(self):
+        user_states.get(self.phone).busy = True
+        return self
+
+    def __exit__(self, *exc):
+        user_states.get(self.phone).busy = False
+        user_states.touch(self.phone)
+
+
+async def _send_worker(http: aiohttp.ClientSession) -> None:
+    """Deliver queued WhatsApp messages until cancelled."""
+    _get, _send = send_queue.get, notifications.send_whatsapp_message
+    while True:
+        chunks, to = await _get()
+        try:
+            for body in chunks:
+                await _send(body, to, session=http)
+        except Exception as exc:
+            logger.error(f"Send worker error for {to}: {exc}")
+        finally:
+            send_queue.task_done()
+
+
+def enqueue_message(body: str, to: str) -> None:
+    """Queue a WhatsApp message without waiting, dropping it if the queue is full."""
+    try:
+        send_queue.put_nowait(((body,), to))
+    except asyncio.QueueFull:
+        logger.error(f"Send queue full, message to {to} dropped")
+
 
-def end_interaction(user_number, last_time):
-    users_in_process[user_number] = False
-    check_time(last_time)
+def end_interaction(user_number, start_ns):
+    user_states.get(user_number).busy = False
+    check_time(start_ns)
     return {"status": "ok"}
 
 
-class HealthCheckResponse(BaseModel):
-    status: str
-    timestamp: str
-    service: str
+_HEALTH_STATIC = {"status": "healthy", "service": "WhatsApp Webhook API"}
+_last_iso: list = [0, ""]  # [epoch second, ISO timestamp]
+
 
+def _iso_cached(_now=time.time) -> str:
+    """Current local time in ISO format, recomputed at most once per second."""
+    t = int(_now())
+    if t != _last_iso[0]:
+        _last_iso[:] = [t, datetime.fromtimestamp(t).isoformat()]
+    return _last_iso[1]
 
-@app.get("/health", response_model=HealthCheckResponse)
-def health_check() -> HealthCheckResponse:
-    return HealthCheckResponse(
-        status="healthy",
-        timestamp=datetime.now().isoformat(),
-        service="WhatsApp Webhook API",
-    )
+
+@app.get("/health", response_class=ORJSONResponse)
+def health_check() -> ORJSONResponse:
+    return ORJSONResponse({**_HEALTH_STATIC, "timestamp": _iso_cached()})
 
 
 @app.get("/whatsapp")
@@ -96,15 +256,14 @@ async def verify_webhook(request: Request):
         challenge = request.query_params.get("hub.challenge")
         token = request.query_params.get("hub.verify_token")
 
-        # Use the same verify token from config or set a new one
-        verify_token_expected = getattr(config, "WHATSAPP_VERIFY_TOKEN", "vibecode")
+        token_match = hmac.compare_digest((token or "").encode(), _VERIFY_TOKEN_B)
 
-        if mode == "subscribe" and token == verify_token_expected:
+        if mode == "subscribe" and token_match:
             logger.info("WEBHOOK VERIFIED for Meta WhatsApp API")
             return int(challenge)  # type: ignore
         else:
             logger.warning(
-                f"Webhook verification failed - Mode: {mode}, Token match: {token == verify_token_expected}"
+                f"Webhook verification failed - Mode: {mode}, Token match: {token_match}"
             )
             raise HTTPException(status_code=403, detail="Forbidden")
     except Exception as e:
@@ -124,7 +283,7 @@ async def parse_webhook_data(request: Request) -> dict | None:
         dict: Parsed webhook data or None if parsing fails
     """
     try:
-        webhook_data = await request.json()
+        webhook_data = orjson.loads(await request.body())
         logger.debug(f"Webhook data received: {webhook_data}")
         return webhook_data
     except Exception as e:
@@ -142,12 +301,8 @@ def extract_message_content(webhook_data: dict) -> tuple[str, str, str] | None:
         tuple: (user_number, message_content, message_id) or None if extraction fails
     """
     try:
-        entry = webhook_data.get("entry", [])[0]
-        changes = entry.get("changes", [])[0]
-        value = changes.get("value", {})
-
-        metadata = value.get("metadata", {})
-        phone_number_id = metadata.get("phone_number_id", "")
+        value = webhook_data["entry"][0]["changes"][0]["value"]
+        phone_number_id = value["metadata"]["phone_number_id"]
 
         if phone_number_id != config.WHATSAPP_PHONE_NUMBER_ID:
             logger.warning(
@@ -163,7 +318,7 @@ def extract_message_content(webhook_data: dict) -> tuple[str, str, str] | None:
             return None
 
         message = messages[0]
-        user_number = message.get("from", "")
+        user_number = message["from"]
         message_id = message.get("id", "")
 
         # Extract message text based on message type
@@ -175,11 +330,40 @@ def extract_message_content(webhook_data: dict) -> tuple[str, str, str] | None:
 
         return user_number, incoming_msg, message_id
 
-    except (IndexError, KeyError) as e:
+    except (IndexError, KeyError, TypeError) as e:
         logger.error(f"Error extracting message data: {e}")
         return None
 
 
+def _extract_text(message: dict) -> str:
+    return message.get("text", {}).get("body", "").strip()
+
+
+def _extract_reply_title(reply_type: str):
+    def extract(interactive: dict) -> str:
+        return interactive.get(reply_type, {}).get("title", "")
+
+    return extract
+
+
+_INTERACTIVE_EXTRACTORS = {
+    "button_reply": _extract_reply_title("button_reply"),
+    "list_reply": _extract_reply_title("list_reply"),
+}
+
+
+def _extract_interactive(message: dict) -> str:
+    interactive = message.get("interactive", {})
+    extractor = _INTERACTIVE_EXTRACTORS.get(interactive.get("type"))
+    return extractor(interactive) if extractor else ""
+
+
+_EXTRACTORS = {
+    "text": _extract_text,
+    "interactive": _extract_interactive,
+}
+
+
 def _extract_text_from_message(message: dict) -> str:
     """Extract text content from different message types.
 
@@ -189,24 +373,11 @@ def _extract_text_from_message(message: dict) -> str:
     Returns:
         str: Extracted text content
     """
-    message_type = message.get("type")
-
-    if message_type == "text":
-        return message.get("text", {}).get("body", "").strip()
-
-    elif message_type == "interactive":
-        interactive = message.get("interactive", {})
-        interactive_type = interactive.get("type")
-
-        if interactive_type == "button_reply":
-            return interactive.get("button_reply", {}).get("title", "")
-        elif interactive_type == "list_reply":
-            return interactive.get("list_reply", {}).get("title", "")
-
-    return ""
+    extractor = _EXTRACTORS.get(message.get("type"))
+    return extractor(message) if extractor else ""
 
 
-async def check_user_availability(user_number: str) -> bool:
+def check_user_availability(user_number: str) -> bool:
     """Check if user is available for new conversation.
 
     Args:
@@ -215,27 +386,15 @@ async def check_user_availability(user_number: str) -> bool:
     Returns:
         bool: True if user is available, False if busy
     """
-    if users_in_process.get(user_number):
+    st = user_states.get(user_number)
+    if st.busy:
         logger.warning(f"Usuario {user_number} en proceso")
 
-        # Mensajes alternativos
-        wait_messages = [
-            "Porfa dame un segundo para terminar de elaborar la respuesta 🕒",
-            "Un momento, estoy procesando tu pedido — te respondo enseguida ⏳",
-            "Disculpa la demora, estoy trabajando para darte la mejor respuesta 🤏",
-            "Estoy revisando la información; te escribo en breve 📡",
-            "Gracias por la paciencia — preparando tu respuesta ahora mismo 🔄",
-        ]
-
-        # Obtener índice actual para el usuario, por defecto 0
-        idx = wait_msg_index.get(user_number, 0)
-        msg = wait_messages[idx % len(wait_messages)]
+        # Obtener índice actual y avanzarlo (siguiente vez se usará el siguiente)
+        msg = WAIT_MESSAGES[st.wait_idx]
+        st.wait_idx = (st.wait_idx + 1) % _N_WAIT
 
-        # Enviar mensaje y actualizar índice (siguiente vez se usará el siguiente)
-        asyncio.create_task(
-            notifications.send_whatsapp_message(body=msg, to=user_number)
-        )
-        wait_msg_index[user_number] = (idx + 1) % len(wait_messages)
+        enqueue_message(msg, user_number)
         return False
 
     return True
@@ -245,19 +404,16 @@ async def _cleanup_inactive() -> None:
     """Periodically clean inactive users and bots to prevent memory growth."""
     while True:
         try:
-            now = time.time()
-            to_remove: list[str] = []
+            now = time.monotonic()
 
-            for phone, ts in list(last_activity.items()):
-                if now - ts > INACTIVITY_TTL_SECONDS and not users_in_process.get(
-                    phone, False
+            for stripe in range(StripedUserState.N):
+                for phone in user_states.pop_expired(
+                    stripe, now, INACTIVITY_TTL_SECONDS
                 ):
-                    to_remove.append(phone)
-
-            for phone in to_remove:
-                bot.chat_memory.delete_chat(phone)
-                last_activity.pop(phone, None)
-                logger.debug(f"Cleaned inactive session for {phone}")
+                    bot.chat_memory.delete_chat(phone)
+                    logger.debug(f"Cleaned inactive session for {phone}")
+                # Let pending requests run between stripes
+                await asyncio.sleep(0)
         except Exception as exc:
             logger.error(f"Cleanup task error: {exc}")
         finally:
@@ -289,45 +445,63 @@ async def gen_ai_msg(
         return ai_msg
     except Exception as exc:
         logger.error(f"AI generation failed: {exc}")
-        bot.chat_memory.delete_chat(user_number)
-        asyncio.create_task(
-            notifications.send_whatsapp_message(
-                "Ha ocurrido un error y el chat fue reiniciado. Por favor, comencemos de nuevo",
-                user_number,
-            )
+        try:
+            bot.chat_memory.delete_chat(user_number)
+        except Exception as del_exc:
+            logger.error(f"Could not reset chat of {user_number}: {del_exc}")
+        enqueue_message(
+            "Ha ocurrido un error y el chat fue reiniciado. Por favor, comencemos de nuevo",
+            user_number,
         )
         return None
 
 
-async def send_ai_msg(ai_msg: str, user_number: str) -> None:
+def iter_chunks(text: str, limit: int) -> Iterator[str]:
+    """Split text into chunks of at most ``limit`` characters.
+
+    Whole lines are packed greedily; a single line over the limit is cut at
+    fixed width. Text within the limit is yielded as a single chunk.
+    """
+    if len(text) > limit:
+        logger.warning(
+            "Respuesta fragmentada por exceder el límite de caracteres de Twilio"
+        )
+
+    buf: list[str] = []
+    size = 0
+    for line in text.split("\n"):
+        extra = len(line) + 1 if buf else len(line)
+        if buf and size + extra > limit:
+            chunk = "\n".join(buf).strip()
+            if chunk:
+                yield chunk
+            buf, size, extra = [], 0, len(line)
+
+        if len(line) > limit:
+            for i in range(0, len(line), limit):
+                chunk = line[i : i + limit].strip()
+                if chunk:
+                    yield chunk
+            continue
+
+        buf.append(line)
+        size += extra
+
+    chunk = "\n".join(buf).strip()
+    if chunk:
+        yield chunk
+
+
+async def send_ai_msg(
+    ai_msg: str, user_number: str, _limit: int = WORDS_LIMIT
+) -> None:
     """Send AI response to user, handling message length limits.
 
     Args:
-        response: AI generated response
+        ai_msg: AI generated response
         user_number: User's phone number
     """
-    if len(ai_msg) <= WORDS_LIMIT:
-        asyncio.create_task(notifications.send_whatsapp_message(ai_msg, user_number))
-        return
-
-    # Handle long messages by splitting them
-    logger.warning(
-        "Respuesta fragmentada por exceder el límite de caracteres de Twilio"
-    )
-
-    start = 0
-    while start < len(ai_msg):
-        end = min(start + WORDS_LIMIT, len(ai_msg))
-
-        # Try to break at newline to avoid cutting words
-        if end < len(ai_msg) and ai_msg[end] != "\n":
-            newline_pos = ai_msg.rfind("\n", start, end)
-            if newline_pos > start:
-                end = newline_pos
-
-        chunk = ai_msg[start:end].strip()
-        asyncio.create_task(notifications.send_whatsapp_message(chunk, user_number))
-        start = end + 1 if ai_msg[end : end + 1] == "\n" else end
+    await send_queue.put((tuple(iter_chunks(ai_msg, _limit)), user_number))
 
 
 # ============================================================================
@@ -335,46 +509,54 @@ async def send_ai_msg(ai_msg: str, user_number: str) -> None:
 # ============================================================================
 
 
-@app.post("/whatsapp")
-async def whatsapp_reply(request: Request, background_tasks: BackgroundTasks):
+async def whatsapp_reply(request: Request) -> ORJSONResponse:
     """Main endpoint for handling WhatsApp webhook messages.
 
     This endpoint processes incoming WhatsApp messages, manages user state,
     generates AI responses, and sends replies back to users.
     """
-    start_time = time.time()
+    start_ns = time.monotonic_ns()
     logger.debug("=" * 125)
 
     # Parse incoming webhook data
     webhook_data = await parse_webhook_data(request)
     if not webhook_data:
-        return {"status": "error"}
+        return ORJSONResponse({"status": "error"})
 
     # Extract message content
     message_data = extract_message_content(webhook_data)
     if not message_data:
-        return {"status": "ok"}
+        return ORJSONResponse({"status": "ok"})
 
     user_number, incoming_msg, message_id = message_data
     if message_id:
-        asyncio.create_task(notifications.mark_whatsapp_message_as_read(message_id))
-
-    if not await check_user_availability(user_number):
-        check_time(start_time)
-        return {"status": "ok"}
+        task = asyncio.create_task(
+            notifications.mark_whatsapp_message_as_read(
+                message_id, session=request.app.state.http
+            )
+        )
+        _read_receipts.add(task)
+        task.add_done_callback(_read_receipts.discard)
 
-    users_in_process[user_number] = True
+    # Timed in finally so slow requests that raise are reported too
     try:
-        logger.info(f"User {user_number}: {incoming_msg}")
+        if not check_user_availability(user_number):
+            return ORJSONResponse({"status": "ok"})
+
+        with _BusyGuard(user_number):
+            logger.info(f"User {user_number}: {incoming_msg}")
 
-        ai_msg = await gen_ai_msg(incoming_msg, user_number)
-        if not ai_msg:
-            logger.error("AI response generation returned None")
-            return {"status": "ok"}
+            ai_msg = await gen_ai_msg(incoming_msg, user_number)
+            if ai_msg:
+                await send_ai_msg(ai_msg, user_number)
+            else:
+                logger.error("AI response generation returned None")
 
-        await send_ai_msg(ai_msg, user_number)
-        return {"status": "ok"}
+        return ORJSONResponse({"status": "ok"})
     finally:
-        users_in_process[user_number] = False
-        last_activity[user_number] = time.time()
-        check_time(start_time)
+        check_time(start_ns)
+
+
+# Registered as a plain Starlette route: the body is parsed manually, so
+# FastAPI's dependency resolution and response validation are not needed.
+app.add_route("/whatsapp", whatsapp_reply, methods=["POST"])
@@ -35,6 +35,9 @@ class GlobalConfig(BaseConfig):
 
     # Others
     WORDS_LIMIT: Optional[int] = None
+    INACTIVITY_TTL_SECONDS: int = 24 * 60 * 60  # 24 horas
+    CLEANUP_INTERVAL_SECONDS: int = 60 * 60  # 1 hora
+    THREAD_POOL_SIZE: int = 32
 
 
 class DevConfig(GlobalConfig):
@@ -1,111 +1,184 @@
 import asyncio
-import json
+import logging
 import os
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+import sys
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping
 
+import orjson
 from dotenv import load_dotenv
-from openai import AsyncOpenAI, OpenAI
+from openai import AsyncOpenAI
 
 from config import config
 from core.enumerations import EffortType, MessageType, ModelType, VerbosityType
 from core.prompt import SYSTEM_PROMPT
+from logging_conf import logger
 
 load_dotenv(".env")
 
+# Max items (messages, tool calls and outputs) kept per chat
+MAX_HISTORY = 50
+
+# Fallback reply when the model output has no message
+NO_ANSWER = "No Answer"
+
+_FUNCTION_CALL_OUTPUT = MessageType.FUNCTION_CALL_OUTPUT.value
+
+# Shared read-only defaults for agents run without tools
+_NO_FUNCTIONS: Mapping[str, Any] = MappingProxyType({})
+_NO_TOOLS: tuple[dict, ...] = ()
+
+
+# Event loop behind the synchronous Agent.process_msg, started on first use
+_sync_loop: asyncio.AbstractEventLoop | None = None
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """Return the background loop, starting its thread if needed.
+
+    A single long-lived loop keeps the AsyncOpenAI connection pool of each
+    Agent valid across calls, unlike asyncio.run.
+    """
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_sync_loop.run_forever, name="agent-loop", daemon=True
+            ).start()
+        return _sync_loop
+
 
 class SetMessagesError(Exception):
     pass
 
 
+class ChatState:
+    """Messages, current-turn tool messages and last model output of a user."""
+
+    __slots__ = ("messages", "tool_msgs", "ai_output")
+
+    def __init__(self, messages: list):
+        self.messages = messages
+        self.tool_msgs: list = []
+        self.ai_output: Any = None
+
+
 class ChatMemory:
     def __init__(self, prompt=SYSTEM_PROMPT):
-        self.__ai_output: dict[str, Any] = {}
-        self.__messages: dict[str, list[dict]] = {}
-        self.__tool_msgs: dict[str, list[dict]] = {}
+        self.__chats: dict[str, ChatState] = {}
         self.init_msg = {
             "role": MessageType.DEVELOPER.value,
             "content": prompt,
         }
         self.__last_time: float
 
-    def get_ai_output(self, user_id: int):
-        if user_id not in self.__ai_output:
+    def get_ai_output(self, user_id: str):
+        st = self.__chats.get(user_id)
+        if st is None or st.ai_output is None:
             return []
 
-        return self.__ai_output[user_id].output
+        return st.ai_output.output
 
-    def get_tool_msgs(self, user_id: int):
-        if user_id not in self.__tool_msgs:
+    def get_tool_msgs(self, user_id: str):
+        st = self.__chats.get(user_id)
+        if st is None:
             return []
-        return self.__tool_msgs[user_id]
+        return st.tool_msgs
 
-    def get_messages(self, user_id: int, with_prompt: bool = True):
-        if user_id not in self.__messages:
-            print(f"{user_id} not found in memory")
+    def get_messages(self, user_id: str, with_prompt: bool = True):
+        st = self.__chats.get(user_id)
+        if st is None:
+            logger.debug("%s not found in memory", user_id)
             self.init_chat(user_id)
+            st = self.__chats[user_id]
 
         if with_prompt:
-            return self.__messages[user_id]
+            return st.messages
         else:
-            return self.__messages[user_id][1:]
+            return st.messages[1:]
 
     def get_last_time(self):
         return self.__last_time
 
-    def _set_ai_output(self, ai_output, user_id: int):
-        self.__ai_output[user_id] = ai_output
-
-        if user_id not in self.__messages:
-            print(f"{user_id} not found in memory")
+    def _set_ai_output(self, ai_output, user_id: str):
+        st = self.__chats.get(user_id)
+        if st is None:
+            logger.warning("%s not found in memory", user_id)
             return False
 
-        if user_id not in self.__tool_msgs:
-            self.__tool_msgs[user_id] = ai_output.output.copy()
-        else:
-            self.__tool_msgs[user_id] += ai_output.output.copy()
-
-        self.__messages[user_id] += ai_output.output.copy()
-
-    def _clean_tool_msgs(self, user_id: int):
-        if user_id not in self.__tool_msgs:
-            print(f"{user_id} not have tool messages")
-
-        self.__tool_msgs[user_id] = []
-
-    def has_chat(self, user_id: int) -> bool:
-        return user_id in self.__messages and len(self.__messages[user_id]) > 0
-
-    def delete_chat(self, user_id: int) -> None:
-        if user_id in self.__messages:
-            del self.__messages[user_id]
-        if user_id in self.__tool_msgs:
-            del self.__tool_msgs[user_id]
-        if user_id in self.__ai_output:
-            del self.__ai_output[user_id]
-
-    def init_chat(self, user_id: int):
+        st.ai_output = ai_output
+        st.tool_msgs += ai_output.output
+        st.messages += ai_output.output
+        self._trim(st, user_id)
+
+    def _clean_tool_msgs(self, user_id: str):
+        st = self.__chats.get(user_id)
+        if st is None:
+            logger.debug("%s not have tool messages", user_id)
+            return
+
+        st.tool_msgs = []
+
+    def _trim(self, st: ChatState, user_id: str) -> None:
+        """Drop the oldest turns once the chat exceeds MAX_HISTORY items.
+
+        The prompt is kept and the cut lands on the nearest user message at or
+        before the newest half, so tool calls stay paired with their outputs
+        and at least MAX_HISTORY // 2 items survive. Trimming down to about
+        half the limit makes the history prefix change rarely, which keeps
+        the provider's prompt cache hitting between trims.
+
+        If no such user message exists (one turn with a long tool loop), the
+        chat is left over the limit until later turns give a cut point.
+        """
+        messages = st.messages
+        if len(messages) <= MAX_HISTORY:
+            return
+
+        for i in range(len(messages) - MAX_HISTORY // 2, 1, -1):
+            msg = messages[i]
+            if isinstance(msg, dict) and msg.get("role") == MessageType.USER.value:
+                del messages[1:i]
+                logger.debug("Chat of %s trimmed to %d items", user_id, len(messages))
+                return
+
+    def has_chat(self, user_id: str) -> bool:
+        st = self.__chats.get(user_id)
+        return st is not None and len(st.messages) > 0
+
+    def delete_chat(self, user_id: str) -> None:
+        self.__chats.pop(user_id, None)
+
+    def init_chat(self, user_id: str):
         self.set_messages([self.init_msg], user_id)
-        print(f"New chat for {user_id}")
+        logger.debug("New chat for %s", user_id)
 
-    def add_msg(self, message: str, role: str, user_id: int):
-        if user_id not in self.__messages:
+    def add_msg(self, message: str, role: str, user_id: str):
+        st = self.__chats.get(user_id)
+        if st is None:
             self.init_chat(user_id)
+            st = self.__chats[user_id]
 
         if MessageType.has_value(role):
-            self.__messages[user_id].append(
+            st.messages.append(
                 {
                     "role": role,
                     "content": message,
                 }
             )
-            print(f"New message from {role} added to chat of {user_id}")
+            logger.debug("New message from %s added to chat of %s", role, user_id)
+            self._trim(st, user_id)
             return True
 
-        print(f"Invalid role {role}, must be one of: {MessageType.list_values()}")
+        logger.warning(
+            "Invalid role %s, must be one of: %s", role, MessageType.list_values()
+        )
         return False
 
-    def set_messages(self, messages: list[dict[str, str]], user_id: int):
+    def set_messages(self, messages: list[dict[str, str]], user_id: str):
         if not isinstance(messages, list):
             raise SetMessagesError(f"messages must be a list, not {type(messages)}")
 
@@ -115,9 +188,13 @@ class ChatMemory:
                     f"Invalid role {msg['role']} in the {id + 1} message, must be one of: {MessageType.list_values()}"
                 )
 
-        self.__messages[user_id] = messages
+        st = self.__chats.get(user_id)
+        if st is None:
+            self.__chats[user_id] = ChatState(messages)
+        else:
+            st.messages = messages
 
-    def _get_ai_msg(self, user_id: int):
+    def _get_ai_msg(self, user_id: str):
         ai_output = self.get_ai_output(user_id)
 
         for item in ai_output:  # type: ignore
@@ -127,41 +204,29 @@ class ChatMemory:
                     return ans
 
             except Exception as exc:
-                print(f"Error retrieving AI message: {exc}")
-                print(item)
+                logger.error("Error retrieving AI message: %s\n%s", exc, item)
 
-        return "No Answer"
+        return NO_ANSWER
 
-    def _purge_tool_msgs(self, user_id: int):
-        tool_msgs = self.get_tool_msgs(user_id)
-        messages = self.get_messages(user_id)
-        if tool_msgs:
-            clean_messages = [m for m in messages if m not in tool_msgs]
-            try:
-                self.set_messages(clean_messages, user_id)
-            except SetMessagesError as exc:
-                print(f"Error purging tool messages: {exc}")
-            finally:
-                self._clean_tool_msgs(user_id)
-
-    def _set_tool_output(self, call_id, function_out, user_id: int):
-        # Store as ephemeral tool output; do not persist in history
-        if user_id not in self.__messages:
-            print(f"{user_id} not found in memory")
+    def _set_tool_output(self, call_id, function_out, user_id: str):
+        # Kept in history; tool_msgs only tracks the outputs of the current turn
+        st = self.__chats.get(user_id)
+        if st is None:
+            logger.warning("%s not found in memory", user_id)
             return False
 
+        # A fresh dict per output: it stays in history and is serialized by the
+        # OpenAI SDK, so neither pooled nor __slots__ objects fit here
         msg = {
-            "type": "function_call_output",
+            "type": _FUNCTION_CALL_OUTPUT,
             "call_id": call_id,
-            "output": str(function_out),
+            "output": function_out
+            if isinstance(function_out, str)
+            else orjson.dumps(function_out, default=str).decode(),
         }
 
-        if user_id not in self.__tool_msgs:
-            self.__tool_msgs[user_id] = [msg]
-        else:
-            self.__tool_msgs[user_id].append(msg)
-
-        self.__messages[user_id].append(msg)
+        st.tool_msgs.append(msg)
+        st.messages.append(msg)
 
 
 class AIClient:
@@ -169,15 +234,24 @@ class AIClient:
         self,
         api_key: str,
     ):
-        self.__client = OpenAI(api_key=api_key)
         self.__async_client = AsyncOpenAI(api_key=api_key)
 
     async def _async_gen_ai_output(self, params: dict):
         ai_output = await self.__async_client.responses.create(**params)
         return ai_output
 
-    def _gen_ai_output(self, params: dict):
-        return self.__client.responses.create(**params)
+    async def _async_stream(self, params: dict, on_delta):
+        """Stream a response, passing each text delta to ``on_delta``.
+
+        Returns:
+            The completed response, same as ``_async_gen_ai_output``
+        """
+        async with self.__async_client.responses.stream(**params) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    on_delta(event.delta)
+
+            return await stream.get_final_response()
 
 
 class ToolRunner:
@@ -187,92 +261,39 @@ class ToolRunner:
     ):
         self.ERROR_MSG = error_msg
 
-    def _run_functions(
-        self,
-        functions_called,
-        user_id: int,
-        chat_memory: ChatMemory,
-        rag_functions,
-    ) -> None:
-        print(f"{len(functions_called)} functions need to be called!")
-
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for tool in functions_called:
-                function_name = tool.name
-                function_args = tool.arguments
-                function_to_call = rag_functions[function_name]
-
-                print(f"function_name: {function_name}")
-                print(
-                    f"function_args: {function_args[:100]}{'...' if len(function_args) > 100 else ''}"
-                )
-                function_args = json.loads(function_args)
-                function_args["phone"] = user_id
-
-                futures.append(executor.submit(function_to_call, **function_args))
-
-            self.run_futures(futures, functions_called, user_id, chat_memory)
-
-    def _run_custom_tools(
-        self, custom_tools_called, user_id: int, chat_memory: ChatMemory, rag_functions
-    ) -> None:
-        print(f"{len(custom_tools_called)} custom tools need to be called!")
-
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for tool in custom_tools_called:
-                print(f"Custom tool name: {tool.name}")
-                print(f"Custom tool input: {tool.input}")
-
-                function_args = {"tool_input": tool.input}
-                function_to_call = rag_functions[tool.name]
-
-                futures.append(executor.submit(function_to_call, **function_args))
-
-            self.run_futures(futures, custom_tools_called, user_id, chat_memory)
-
-    def run_futures(self, futures, tools_called, user_id: int, chat_memory: ChatMemory):
-        for future, tool in zip(futures, tools_called):
-            try:
-                function_out = future.result()
-                print(f"{tool.name}: {function_out[:100]}")  # type: ignore
-            except Exception as exc:
-                print(f"{tool.name}: {exc}")
-                function_out = self.ERROR_MSG
-
-            chat_memory._set_tool_output(tool.call_id, function_out, user_id)
-
     async def _async_run_functions(
-        self, functions_called, user_id: int, chat_memory: ChatMemory, rag_functions
+        self, functions_called, user_id: str, chat_memory: ChatMemory, rag_functions
     ) -> None:
-        print(f"{len(functions_called)} function need to be called!")
+        logger.debug("%d function need to be called!", len(functions_called))
         tasks = []
         for tool in functions_called:
             function_name = tool.name
             function_args = tool.arguments
             function_to_call = rag_functions[function_name]  # type: ignore
 
-            print(f"function_name: {function_name}")
-            print(
-                f"function_args: {function_args[:100]}{'...' if len(function_args) > 100 else ''}"
-            )
-            function_args = json.loads(function_args)
-            function_args["phone"] = user_id
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("function_name: %s", function_name)
+                logger.debug(
+                    "function_args: %s%s",
+                    function_args[:100],
+                    "..." if len(function_args) > 100 else "",
+                )
+            function_args = orjson.loads(function_args)
+            function_args["phone"] = str(user_id)
 
             tasks.append(function_to_call(**function_args))
 
         await self.run_coroutines(functions_called, tasks, user_id, chat_memory)
 
     async def _async_run_custom_tools(  # type: ignore
-        self, custom_tools_called, user_id: int, chat_memory: ChatMemory, rag_functions
+        self, custom_tools_called, user_id: str, chat_memory: ChatMemory, rag_functions
     ) -> None:
-        print(f"{len(custom_tools_called)} custom tools need to be called!")
+        logger.debug("%d custom tools need to be called!", len(custom_tools_called))
 
         tasks = []
         for tool in custom_tools_called:
-            print(f"function_name: {tool.name}")
-            print(f"Input tool: {tool.input}")
+            logger.debug("function_name: %s", tool.name)
+            logger.debug("Input tool: %s", tool.input)
 
             function_to_call = rag_functions[tool.name]  # type: ignore
             function_args = {"tool_input": tool.input}
@@ -282,19 +303,37 @@ class ToolRunner:
         await self.run_coroutines(custom_tools_called, tasks, user_id, chat_memory)
 
     async def run_coroutines(
-        self, tools_called, tasks, user_id: int, chat_memory: ChatMemory
+        self, tools_called, tasks, user_id: str, chat_memory: ChatMemory
     ):
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async with asyncio.TaskGroup() as tg:
+            running = [
+                tg.create_task(self._call_tool(tool, coro), name=tool.name)
+                for tool, coro in zip(tools_called, tasks)
+            ]
 
-        for tool, function_out in zip(tools_called, results):
+        # Outputs go to history in call order, not completion order, so the
+        # same run always yields the same history
+        for task in running:
+            tool, function_out = task.result()
             if isinstance(function_out, Exception):
-                print(f"{tool.name}: {function_out}")
+                logger.error("%s: %s", tool.name, function_out)
                 function_out = self.ERROR_MSG  # type: ignore
-            else:
-                print(f"{tool.name}: {function_out[:100]}")  # type: ignore
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s: %s", tool.name, str(function_out)[:100])
 
             chat_memory._set_tool_output(tool.call_id, function_out, user_id)
 
+    @staticmethod
+    async def _call_tool(tool, coro):
+        """Await a tool, returning its exception instead of raising it.
+
+        A raising task would make the TaskGroup cancel the remaining tools.
+        """
+        try:
+            return tool, await coro
+        except Exception as exc:
+            return tool, exc
+
 
 class Agent:
     def __init__(
@@ -310,15 +349,9 @@ class Agent:
         self._ai_client = AIClient(api_key)
         self._tool_runner = ToolRunner()
 
-    def run_callback(self, tool_execution_callback, user_id):
-        reasoning_items = [
-            item
-            for item in self.chat_memory.get_ai_output(user_id)
-            if item.type == "reasoning"
-        ]
-
+    def run_callback(self, tool_execution_callback, reasoning_items):
         if reasoning_items:
-            print(f"{len(reasoning_items)} reasoning items have founded")
+            logger.debug("%d reasoning items have founded", len(reasoning_items))
             reasoning_content = None
             for reasoning_item in reasoning_items:
                 if hasattr(reasoning_item, "content") and reasoning_item.content:
@@ -330,85 +363,77 @@ class Agent:
 
             if reasoning_content:
                 tool_execution_callback(reasoning_content)
+                return
 
-        print("No reasoning content to show")
+        logger.debug("No reasoning content to show")
 
     def process_msg(
         self,
         message: str,
-        user_id: int,
-        rag_functions: dict = {},
-        rag_prompt: list[dict] = [],
+        user_id: str,
+        rag_functions: dict | None = None,
+        rag_prompt: list[dict] | None = None,
         tool_execution_callback=None,
+        stream_callback=None,
     ) -> str | None:
-        print(f"Running {self.model} with {len(rag_prompt)} tools")
-
-        self.chat_memory.add_msg(message, MessageType.USER.value, user_id)
-
-        while True:
-            params = {
-                "model": self.model,  # type: ignore
-                "input": self.chat_memory.get_messages(user_id),  # type: ignore
-            }
-            if rag_prompt:
-                params["tools"] = rag_prompt
-            if self.model == ModelType.GPT_5.value:  # type: ignore
-                params["text"] = {"verbosity": VerbosityType.LOW.value}
-                params["reasoning"] = {"effort": EffortType.LOW.value}
-
-            ai_output = self._ai_client._gen_ai_output(params)
-            self.chat_memory._set_ai_output(ai_output, user_id)
-
-            functions_called = [
-                item
-                for item in ai_output.output  # type: ignore
-                if item.type == MessageType.FUNCTION_CALL.value
-            ]
-
-            custom_tools_called = [
-                item
-                for item in ai_output.output  # type: ignore
-                if item.type == MessageType.CUSTOM_TOOL_CALL.value
-            ]
-
-            if not functions_called and not custom_tools_called:
-                break
-
-            if tool_execution_callback:
-                self.run_callback(tool_execution_callback, user_id)
-
-            if functions_called:
-                self._tool_runner._run_functions(
-                    functions_called,
-                    user_id,
-                    self.chat_memory,
-                    rag_functions,
-                )
-
-            if custom_tools_called:
-                self._tool_runner._run_custom_tools(
-                    custom_tools_called,
-                    user_id,
-                    self.chat_memory,
-                    rag_functions,
-                )
+        """Synchronous wrapper around ``async_process_msg``.
+
+        Tools are coroutines, so the call runs on a shared background loop
+        and blocks until it finishes; it also works from a thread that is
+        already running its own loop.
+
+        Loop-bound state (the Agent's AsyncOpenAI client, the users store
+        lock in core.tools._store) is then tied to that background loop, so
+        a process should use either this method or ``async_process_msg`` on
+        its own loop (as the API does), not both.
+
+        Raises:
+            RuntimeError: if called from the background loop itself, where
+                waiting for the result would deadlock
+        """
+        loop = _get_sync_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError(
+                "process_msg called from the agent loop; await async_process_msg"
+            )
 
-        self.chat_memory._purge_tool_msgs(user_id)
-        ai_msg = self.chat_memory._get_ai_msg(user_id)
-        print(f"{self.name}: {ai_msg}")
-        self.chat_memory.add_msg(ai_msg, MessageType.ASSISTANT.value, user_id)
-        # print(self.chat_memory.get_messages(user_id, with_prompt=False))
-        return ai_msg
+        future = asyncio.run_coroutine_threadsafe(
+            self.async_process_msg(
+                message,
+                user_id,
+                rag_functions=rag_functions,
+                rag_prompt=rag_prompt,
+                tool_execution_callback=tool_execution_callback,
+                stream_callback=stream_callback,
+            ),
+            loop,
+        )
+        return future.result()
 
     async def async_process_msg(
         self,
         message: str,
-        user_id: int,
-        rag_functions: dict = {},
-        rag_prompt: list[dict] = [],
+        user_id: str,
+        rag_functions: dict | None = None,
+        rag_prompt: list[dict] | None = None,
         tool_execution_callback=None,
+        stream_callback=None,
     ) -> str | None:
-        print(f"Running {self.model} with {len(rag_prompt)} tools")
+        """Answer a user message, running any tools the model calls.
+
+        When ``stream_callback`` is given, the response is streamed and each
+        text delta is passed to it as soon as it arrives.
+        """
+        # Interned once here and passed on, so the chat key stored on the first
+        # message and every later lookup this turn are the same object
+        user_id = sys.intern(user_id)
+        rag_functions = rag_functions or _NO_FUNCTIONS
+        rag_prompt = rag_prompt or _NO_TOOLS
+        logger.debug("Running %s with %d tools", self.model, len(rag_prompt))
 
         self.chat_memory.add_msg(message, MessageType.USER.value, user_id)
 
@@ -423,26 +448,29 @@ class Agent:
                 params["text"] = {"verbosity": VerbosityType.LOW.value}
                 params["reasoning"] = {"effort": EffortType.LOW.value}
 
-            ai_output = await self._ai_client._async_gen_ai_output(params)
+            if stream_callback:
+                ai_output = await self._ai_client._async_stream(
+                    params, stream_callback
+                )
+            else:
+                ai_output = await self._ai_client._async_gen_ai_output(params)
             self.chat_memory._set_ai_output(ai_output, user_id)
 
-            functions_called = [
-                item
-                for item in ai_output.output  # type: ignore
-                if item.type == MessageType.FUNCTION_CALL.value
-            ]
-
-            custom_tools_called = [
-                item
-                for item in ai_output.output  # type: ignore
-                if item.type == MessageType.CUSTOM_TOOL_CALL.value
-            ]
+            functions_called, custom_tools_called, reasoning_items = [], [], []
+            for item in ai_output.output:  # type: ignore
+                item_type = item.type
+                if item_type == MessageType.FUNCTION_CALL.value:
+                    functions_called.append(item)
+                elif item_type == MessageType.CUSTOM_TOOL_CALL.value:
+                    custom_tools_called.append(item)
+                elif item_type == "reasoning":
+                    reasoning_items.append(item)
 
             if not functions_called and not custom_tools_called:
                 break
 
             if tool_execution_callback:
-                self.run_callback(tool_execution_callback, user_id)
+                self.run_callback(tool_execution_callback, reasoning_items)
 
             if functions_called:
                 await self._tool_runner._async_run_functions(
@@ -460,10 +488,11 @@ class Agent:
                     rag_functions,
                 )
 
-        self.chat_memory._purge_tool_msgs(user_id)
+        # Tool calls, their outputs and the reply stay in history unchanged so
+        # the next request shares a byte-identical prefix (provider prompt cache)
+        self.chat_memory._clean_tool_msgs(user_id)
         ai_msg = self.chat_memory._get_ai_msg(user_id)
-        print(f"{self.name}: {ai_msg}")
-        self.chat_memory.add_msg(ai_msg, MessageType.ASSISTANT.value, user_id)
+        logger.info("%s: %s", self.name, ai_msg)
         return ai_msg
 
 
@@ -515,7 +544,8 @@ async def console_chat_main():
             print("🤖 Procesando...")
 
             try:
-                await bot.async_process_msg(user_input, user_id="console")
+                ai_msg = await bot.async_process_msg(user_input, user_id="console")
+                print(f"🤖 {ai_msg}")
                 conversation_count += 1
 
             except Exception as exc:
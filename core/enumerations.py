@@ -29,11 +29,16 @@ class MessageType(Enum):
 
     @classmethod
     def has_value(cls, value: str) -> bool:
-        return value in cls._value2member_map_
+        return value in _MESSAGE_TYPE_SET
 
     @classmethod
-    def list_values(cls) -> list[str]:
-        return [member.value for member in cls]
+    def list_values(cls) -> tuple[str, ...]:
+        return _MESSAGE_TYPE_VALUES
+
+
+# Precomputed once: MessageType is checked on every message added to a chat
+_MESSAGE_TYPE_VALUES = tuple(member.value for member in MessageType)
+_MESSAGE_TYPE_SET = frozenset(_MESSAGE_TYPE_VALUES)
 
 
 class EffortType(Enum):
@@ -10,6 +10,25 @@ from config import config
 from logging_conf import logger
 
 
+class _Session:
+    """Use the given aiohttp session, or open (and close) a short-lived one."""
+
+    __slots__ = ("_session", "_owned")
+
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        self._session = session
+        self._owned = session is None
+
+    async def __aenter__(self) -> aiohttp.ClientSession:
+        if self._owned:
+            self._session = aiohttp.ClientSession()
+        return self._session  # type: ignore
+
+    async def __aexit__(self, *exc):
+        if self._owned:
+            await self._session.close()  # type: ignore
+
+
 async def send_email(
     email_to: str,
     subject: str,
@@ -80,8 +99,13 @@ async def send_email(
         return False
 
 
-async def send_whatsapp_message(body, to, media=None):
-    """Send WhatsApp message using Meta's WhatsApp Business API"""
+async def send_whatsapp_message(
+    body, to, media=None, *, session: Optional[aiohttp.ClientSession] = None
+):
+    """Send WhatsApp message using Meta's WhatsApp Business API
+
+    Reuses ``session`` when given so connections and TLS handshakes are shared.
+    """
     if config.ENV_STATE == "test":
         return True
 
@@ -110,8 +134,8 @@ async def send_whatsapp_message(body, to, media=None):
                 "text": {"body": body},
             }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as resp:
+        async with _Session(session) as http:
+            async with http.post(url, headers=headers, json=payload) as resp:
                 data = await resp.json(content_type=None)
                 if resp.status == 200:
                     logger.debug(f"Mensaje enviado exitosamente a {to}")
@@ -128,7 +152,9 @@ async def send_whatsapp_message(body, to, media=None):
         return False
 
 
-async def send_whatsapp_message_with_retry(body, to, media=None):
+async def send_whatsapp_message_with_retry(
+    body, to, media=None, *, session: Optional[aiohttp.ClientSession] = None
+):
     """Send WhatsApp message with retry logic using Meta's API"""
     if config.ENV_STATE == "test":
         return True
@@ -162,8 +188,8 @@ async def send_whatsapp_message_with_retry(body, to, media=None):
                     "text": {"body": body},
                 }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=payload) as resp:
+            async with _Session(session) as http:
+                async with http.post(url, headers=headers, json=payload) as resp:
                     if resp.status == 200:
                         logger.debug(f"Mensaje enviado exitosamente a {to}")
                         return True
@@ -183,11 +209,14 @@ async def send_whatsapp_message_with_retry(body, to, media=None):
     return False
 
 
-async def mark_whatsapp_message_as_read(message_id: str) -> bool:
+async def mark_whatsapp_message_as_read(
+    message_id: str, *, session: Optional[aiohttp.ClientSession] = None
+) -> bool:
     """Mark an incoming WhatsApp message as read using Meta's API.
 
     Args:
         message_id: The WAMID of the incoming message to mark as read
+        session: Shared aiohttp session to reuse (optional)
 
     Returns:
         bool: True if successfully marked as read, False otherwise
@@ -209,8 +238,8 @@ async def mark_whatsapp_message_as_read(message_id: str) -> bool:
             "message_id": message_id,
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as resp:
+        async with _Session(session) as http:
+            async with http.post(url, headers=headers, json=payload) as resp:
                 if resp.status == 200:
                     logger.debug(f"Mensaje {message_id} marcado como leído")
                     return True
@@ -0,0 +1,123 @@
+import asyncio
+import os
+from pathlib import Path
+
+import orjson
+
+USERS_FILE = Path(__file__).parent.parent / "users.json"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write to a temporary file and rename it over ``path``."""
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class UsersStore:
+    """Users from users.json indexed by email and phone.
+
+    The file is loaded lazily and parsed again only when its mtime changes;
+    reads and writes run in the default executor to keep the event loop free.
+    Records are mutated in place so the list and the indexes share the same
+    dicts; ``add`` and ``update`` write the file under a lock first and only
+    then apply the change in memory, so a failed write leaves both as they
+    were.
+
+    The lock is an ``asyncio.Lock``, so a store must only be used from one
+    event loop (see ``Agent.process_msg``).
+    """
+
+    def __init__(self, path: Path = USERS_FILE):
+        self.path = path
+        self.users: list[dict] = []
+        self.by_email: dict[str, dict] = {}
+        self.by_phone: dict[str, dict] = {}
+        self._mtime_ns: int | None = -1  # -1: never loaded, None: no file
+        self._lock = asyncio.Lock()
+
+    def _stat_mtime_ns(self) -> int | None:
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _index(self, user: dict) -> None:
+        if user.get("email"):
+            self.by_email.setdefault(user["email"], user)
+        if user.get("phone"):
+            self.by_phone.setdefault(user["phone"], user)
+
+    def _unindex(self, user: dict) -> None:
+        if self.by_email.get(user.get("email")) is user:
+            del self.by_email[user["email"]]
+        if self.by_phone.get(user.get("phone")) is user:
+            del self.by_phone[user["phone"]]
+
+    async def load(self) -> "UsersStore":
+        """Re-read users.json if it changed since the last load or save."""
+        if self._stat_mtime_ns() == self._mtime_ns:
+            return self
+
+        # A write in progress may already have replaced the file without having
+        # recorded its mtime yet; wait for it and check again
+        async with self._lock:
+            mtime_ns = self._stat_mtime_ns()
+            if mtime_ns == self._mtime_ns:
+                return self
+
+            if mtime_ns is None:
+                self.users = []
+            else:
+                raw = await asyncio.to_thread(self.path.read_bytes)
+                self.users = orjson.loads(raw)
+
+            self.by_email = {}
+            self.by_phone = {}
+            for user in self.users:
+                self._index(user)
+
+            self._mtime_ns = mtime_ns
+        return self
+
+    def find_by_email(self, email: str) -> dict | None:
+        return self.by_email.get(email)
+
+    def find_by_phone(self, phone: str) -> dict | None:
+        return self.by_phone.get(phone)
+
+    async def add(self, user: dict) -> None:
+        """Append ``user`` and write the file; memory changes only on success."""
+        async with self._lock:
+            await self._write([*self.users, user])
+            self.users.append(user)
+            self._index(user)
+
+    async def update(self, user: dict, **fields) -> bool:
+        """Update ``user`` in place and write the file.
+
+        The indexes are kept consistent; memory changes only on success.
+
+        Returns:
+            bool: False if every field already had the given value
+        """
+        if all(user.get(key) == value for key, value in fields.items()):
+            return False
+
+        async with self._lock:
+            updated = {**user, **fields}
+            await self._write([updated if u is user else u for u in self.users])
+            self._unindex(user)
+            user.update(fields)
+            self._index(user)
+        return True
+
+    async def _write(self, users: list[dict]) -> None:
+        # Callers hold self._lock
+        data = orjson.dumps(users, option=orjson.OPT_INDENT_2)
+        await asyncio.to_thread(_write_atomic, self.path, data)
+
+        self._mtime_ns = self._stat_mtime_ns()
+
+
+store = UsersStore()
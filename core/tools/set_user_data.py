@@ -1,32 +1,21 @@
-import json
-from pathlib import Path
+from core.tools._store import store
 
 
 async def set_user_data(
     email: str, name: str = None, phone: str = None, telegram_id: str = None
 ) -> str:
     try:
-        users_file = Path(__file__).parent.parent / "users.json"
+        await store.load()
 
-        if users_file.exists():
-            with open(users_file, "r", encoding="utf-8") as f:
-                users = json.load(f)
-        else:
-            users = []
+        user = store.find_by_email(email)
+        if user is not None:
+            fields = {"phone": phone, "telegram_id": telegram_id, "name": name}
+            # Only overwrite the fields that were actually provided
+            fields = {key: value for key, value in fields.items() if value is not None}
 
-        for user in users:
-            if user.get("email") == email:
-                user = {
-                    "email": email,
-                    "phone": phone,
-                    "telegram_id": telegram_id,
-                    "name": name,
-                }
+            await store.update(user, **fields)
 
-                with open(users_file, "w", encoding="utf-8") as f:
-                    json.dump(users, f, indent=4, ensure_ascii=False)
-
-                return "Datos actualizados"
+            return "Datos actualizados"
 
         return f"El usuario con email {email} no está registrado"
 
@@ -1,32 +1,31 @@
-import json
-from pathlib import Path
+from core.tools._store import store
 
 
 async def fast_user_check(phone: str) -> str:
-    return await user_check(phone, "")
+    try:
+        await store.load()
 
+        if store.find_by_phone(phone) is not None:
+            return f"El usuario con el telefono {phone} ya está registrado"
 
-async def user_check(phone: str, email: str) -> str:
-    try:
-        users_file = Path(__file__).parent.parent / "users.json"
+        return f"El usuario con el telefono {phone} no está registrado"
+
+    except Exception as e:
+        return f"Error buscando el usuario: {str(e)}"
 
-        if users_file.exists():
-            with open(users_file, "r", encoding="utf-8") as f:
-                users = json.load(f)
-        else:
-            users = []
 
-        for user in users:
-            if user.get("phone") == phone:
-                return f"El usuario con el telefono {phone} ya está registrado"
+async def user_check(phone: str, email: str) -> str:
+    try:
+        await store.load()
 
-            if email and user.get("email") == email:
-                user["phone"] = phone
+        if store.find_by_phone(phone) is not None:
+            return f"El usuario con el telefono {phone} ya está registrado"
 
-                with open(users_file, "w", encoding="utf-8") as f:
-                    json.dump(users, f, indent=4, ensure_ascii=False)
+        user = store.find_by_email(email) if email else None
+        if user is not None:
+            await store.update(user, phone=phone)
 
-                return f"El usuario con email {email} ya estaba registrado. Se le ha asignado su numero de telefono"
+            return f"El usuario con email {email} ya estaba registrado. Se le ha asignado su numero de telefono"
 
         return (
             f"El usuario con el telefono {phone} y el email {email} no está registrado"
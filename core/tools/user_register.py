@@ -1,22 +1,14 @@
-import json
-from pathlib import Path
+from core.tools._store import store
 
 
 async def user_register(
     email: str, name: str = None, phone: str = None, telegram_id: str = None
 ) -> str:
     try:
-        users_file = Path(__file__).parent.parent / "users.json"
+        await store.load()
 
-        if users_file.exists():
-            with open(users_file, "r", encoding="utf-8") as f:
-                users = json.load(f)
-        else:
-            users = []
-
-        for user in users:
-            if user.get("email") == email:
-                return f"El usuario con email {email} ya está registrado"
+        if store.find_by_email(email) is not None:
+            return f"El usuario con email {email} ya está registrado"
 
         new_user = {
             "email": email,
@@ -25,10 +17,7 @@ async def user_register(
             "name": name,
         }
 
-        users.append(new_user)
-
-        with open(users_file, "w", encoding="utf-8") as f:
-            json.dump(users, f, indent=4, ensure_ascii=False)
+        await store.add(new_user)
 
         return f"Usuario {email} registrado exitosamente"
 
@@ -0,0 +1,18 @@
+import os
+
+# config.py requires every setting at import time; tests only need placeholders
+os.environ.setdefault("ENV_STATE", "dev")
+for name in (
+    "OPENAI_API_KEY",
+    "WHATSAPP_ACCESS_TOKEN",
+    "WHATSAPP_PHONE_NUMBER_ID",
+    "WHATSAPP_VERIFY_TOKEN",
+    "EMAIL",
+    "DEV_EMAIL",
+    "ADMIN_EMAIL",
+    "EMAIL_PASSWORD",
+    "EMAIL_HOST",
+    "SENTRY_DSN",
+    "HOST",
+):
+    os.environ.setdefault(f"DEV_{name}", "test")
@@ -0,0 +1,58 @@
+from core.agent import MAX_HISTORY, ChatMemory, ChatState
+from core.enumerations import MessageType
+
+USER = MessageType.USER.value
+ASSISTANT = MessageType.ASSISTANT.value
+
+
+def user_msg(text: str) -> dict:
+    return {"role": USER, "content": text}
+
+
+def tool_output(call_id: str) -> dict:
+    return {"type": "function_call_output", "call_id": call_id, "output": ""}
+
+
+def trimmed(messages: list) -> list:
+    st = ChatState(messages)
+    ChatMemory(prompt="prompt")._trim(st, "user")
+    return st.messages
+
+
+def test_trim_keeps_empty_and_prompt_only_chats():
+    memory = ChatMemory(prompt="prompt")
+    assert trimmed([]) == []
+    assert trimmed([memory.init_msg]) == [memory.init_msg]
+
+
+def test_trim_keeps_chat_at_limit():
+    messages = [ChatMemory(prompt="prompt").init_msg]
+    messages += [user_msg(str(i)) for i in range(MAX_HISTORY - 1)]
+    assert len(trimmed(list(messages))) == MAX_HISTORY
+
+
+def test_trim_cuts_at_user_message_keeping_prompt():
+    memory = ChatMemory(prompt="prompt")
+    messages = [memory.init_msg] + [user_msg(str(i)) for i in range(MAX_HISTORY)]
+
+    result = trimmed(messages)
+
+    assert result[0] is memory.init_msg
+    assert result[1]["role"] == USER
+    assert len(result) == MAX_HISTORY // 2 + 1
+
+
+def test_trim_after_long_tool_turn_keeps_conversation():
+    memory = ChatMemory(prompt="prompt")
+    for text in ("hola", "mi email es a@b.c"):
+        memory.add_msg(text, USER, "user")
+        memory.add_msg("ok", ASSISTANT, "user")
+    messages = memory.get_messages("user")
+    messages += [tool_output(str(i)) for i in range(60)]
+
+    memory.add_msg("¿cuál es mi email?", USER, "user")
+
+    result = memory.get_messages("user")
+    assert len(result) > 2
+    assert user_msg("mi email es a@b.c") in result
+    assert result[-1] == user_msg("¿cuál es mi email?")